@@ -1,7 +1,7 @@
 import streamlit as st
 import pandas as pd
 import plotly.express as px
-import numpy as np # Optional, useful for some data manipulations
+import numpy as np # Used for the combined filter mask
 
 # --- Page Configuration ---
 st.set_page_config(
@@ -10,17 +10,57 @@ st.set_page_config(
     layout="wide" # Use wide layout for more space
 )
 
+# Columns shown in the details table (notes placed at the end for readability)
+DISPLAY_COLUMNS = [
+    'Rep', 'Scoring', 'Vertikal', 'Firma', 'Vorname', 'Nachname',
+    'E-Mail', 'Phone', 'LinkedIn',
+    'Event Outcome', 'Follow up', 'Upsell Potential',
+    'Notizen', 'Extra Notizen'
+]
+# Columns exposed as sidebar filters
+FILTER_COLUMNS = ['Scoring', 'Vertikal', 'Follow up', 'Rep', 'Event Outcome']
+# Columns the overview charts count
+CHART_COLUMNS = ['Vertikal', 'Rep', 'Event Outcome', 'Scoring']
+# Everything the dashboard touches; other CSV columns are dropped at read time
+# so every later scan and slice moves fewer bytes
+USED_COLUMNS = list(dict.fromkeys(DISPLAY_COLUMNS + FILTER_COLUMNS))
+
 # --- Load Data ---
-# Use caching to load data only once and improve performance
-@st.cache_data
-def load_data(file_path="internorga_leads.csv"):
+# Use caching to load data only once and improve performance.
+# cache_resource returns the same DataFrame object on every rerun (no pickling
+# and no re-hashing of the frame, unlike cache_data), so callers must treat
+# the returned frame as read-only.
+@st.cache_resource
+def _load_raw(file_path):
     """Loads the lead data from a CSV file."""
     try:
-        df = pd.read_csv(file_path)
+        # pyarrow parses the CSV multi-threaded and in one pass, cutting the
+        # cold-start load compared to the default C engine. Only read the
+        # columns the dashboard uses (peek at the header first, since the
+        # pyarrow engine rejects usecols names missing from the file).
+        header = pd.read_csv(file_path, nrows=0).columns
+        df = pd.read_csv(file_path, engine='pyarrow',
+                         usecols=[c for c in header if c in USED_COLUMNS])
         # Basic Data Cleaning (Adapt as needed)
         # Handle potential '/' or blank scores - replace with 'Unscored'
         if 'Scoring' in df.columns:
             df['Scoring'] = df['Scoring'].fillna('Unscored').replace(['/', ''], 'Unscored')
+        # Low-cardinality string columns: store as category so isin/value_counts
+        # work on integer codes instead of hashing Python strings
+        for col in FILTER_COLUMNS:
+            if col in df.columns:
+                df[col] = df[col].astype('category')
+        # Normalize the searchable text columns once: real string dtype with
+        # missing values as empty strings, so no per-rerun astype(str) is ever
+        # needed (and a search for "nan" no longer matches missing cells)
+        for col in ('Firma', 'Vorname', 'Nachname'):
+            if col in df.columns:
+                df[col] = df[col].astype('string').fillna('')
+        # Precompute a lowercase blob of the searchable text columns so the
+        # sidebar search is one substring scan instead of three regex passes
+        df['_search_blob'] = (
+            df['Firma'] + '\x1f' + df['Vorname'] + '\x1f' + df['Nachname']
+        ).str.lower()
         # Convert Yes/No columns to more standard format if necessary (e.g., boolean or consistent strings)
         # Example: df['Upsell Potential'] = df['Upsell Potential'].map({'Yes': True, 'No': False, 'Ja': True, 'Nein': False})
         return df
@@ -31,53 +71,138 @@ def load_data(file_path="internorga_leads.csv"):
         st.error(f"An error occurred while loading the data: {e}")
         return None
 
+def load_data(file_path="internorga_leads.csv"):
+    """Returns the shared, cached lead DataFrame. Treat it as read-only."""
+    return _load_raw(file_path)
+
+@st.cache_resource(hash_funcs={pd.DataFrame: id})
+def get_filter_options(df):
+    """Extracts sorted unique values for the filter columns once per dataset.
+
+    cache_resource hands back the same tuples on every rerun — no per-access
+    copy like cache_data — so widget options stay cheap Python immutables.
+    load_data already returns a cached frame, making identity hashing safe.
+    """
+    return {col: tuple(sorted(df[col].dropna().unique().tolist()))
+            for col in FILTER_COLUMNS}
+
+def isin_mask(series, selected):
+    """Membership mask for a categorical column via a boolean LUT over its codes.
+
+    Builds a lookup table of length n_categories+1 and gathers it with the
+    int8 category codes — a branchless array lookup instead of the hashtable
+    probe Series.isin would do. Slot 0 absorbs the -1 code of missing values.
+    """
+    lut = np.zeros(len(series.cat.categories) + 1, dtype=bool)
+    idx = series.cat.categories.get_indexer(selected)
+    lut[idx[idx >= 0] + 1] = True
+    return lut[series.cat.codes.to_numpy() + 1]
+
+def category_counts(series):
+    """Per-category counts as a single bincount over the integer codes.
+
+    Returns (categories, counts); the -1 codes of missing values are excluded.
+    """
+    codes = series.cat.codes.to_numpy()
+    counts = np.bincount(codes[codes >= 0], minlength=len(series.cat.categories))
+    return series.cat.categories, counts
+
+def column_counts(df, col):
+    """Observed per-category counts for one column as a Plotly-ready frame."""
+    # A bincount over the int8 category codes is the cheapest unsorted count
+    # available (the charts lay out their own order, and the Rep bar fallback
+    # sorts explicitly); drop the buckets the active filters emptied
+    categories, counts = category_counts(df[col])
+    observed = counts > 0
+    return pd.DataFrame({col: categories[observed], 'Count': counts[observed]})
+
+@st.cache_data(hash_funcs={pd.DataFrame: lambda _: None})
+def chart_counts(df, filter_key):
+    """Counts for every chart column, fused into one cached call per filter state.
+
+    The four bincounts run back-to-back over the filtered frame's code columns
+    and land in a single cache entry, instead of four separate lookups. The
+    DataFrame itself is excluded from the cache key (it is fully determined by
+    filter_key), so Streamlit never has to hash the frame on lookup.
+    """
+    return {col: column_counts(df, col) for col in CHART_COLUMNS if col in df.columns}
+
+# Cached figure builders: the counts frames are tiny, so keying on their
+# content is cheap, and unchanged selections skip the Plotly (re)serialization.
+@st.cache_data
+def make_bar_chart(counts_df, title):
+    fig = px.bar(counts_df, x=counts_df.columns[0], y='Count', title=title,
+                 text_auto=True) # Show count on bars
+    fig.update_layout(xaxis_title=None) # Cleaner axis
+    return fig
+
+@st.cache_data
+def make_pie_chart(counts_df, title, textinfo=None):
+    fig = px.pie(counts_df, names=counts_df.columns[0], values='Count',
+                 title=title, hole=0.3) # Donut style
+    if textinfo:
+        fig.update_traces(textposition='inside', textinfo=textinfo)
+    return fig
+
 df = load_data()
 
 # --- Sidebar Filters ---
 st.sidebar.header("Filter Leads:")
 
 if df is not None:
-    # Get unique values for filters, handling potential missing values
-    scoring_options = sorted(df['Scoring'].dropna().unique())
-    vertikal_options = sorted(df['Vertikal'].dropna().unique())
-    follow_up_options = sorted(df['Follow up'].dropna().unique())
-    rep_options = sorted(df['Rep'].dropna().unique())
-    outcome_options = sorted(df['Event Outcome'].dropna().unique())
-
-    # Add multiselect filters to the sidebar
-    selected_scoring = st.sidebar.multiselect("Filter by Scoring:", scoring_options, default=scoring_options)
-    selected_vertikal = st.sidebar.multiselect("Filter by Vertikal:", vertikal_options, default=vertikal_options)
-    selected_follow_up = st.sidebar.multiselect("Filter by Follow up:", follow_up_options, default=follow_up_options)
-    selected_rep = st.sidebar.multiselect("Filter by Rep:", rep_options, default=rep_options) # Added Rep filter
-    selected_outcome = st.sidebar.multiselect("Filter by Event Outcome:", outcome_options, default=outcome_options) # Added Outcome filter
+    # Get unique values for filters (cached, so reruns skip the unique+sort passes)
+    filter_options = get_filter_options(df)
+    scoring_options = filter_options['Scoring']
+    vertikal_options = filter_options['Vertikal']
+    follow_up_options = filter_options['Follow up']
+    rep_options = filter_options['Rep']
+    outcome_options = filter_options['Event Outcome']
+
+    # Add multiselect filters to the sidebar. An empty selection means "show
+    # everything", so the defaults stay empty — this avoids passing (and
+    # diffing) the full option lists on every rerun, and the common
+    # nothing-selected case skips the isin scans entirely.
+    selected_scoring = st.sidebar.multiselect("Filter by Scoring:", scoring_options, placeholder="All")
+    selected_vertikal = st.sidebar.multiselect("Filter by Vertikal:", vertikal_options, placeholder="All")
+    selected_follow_up = st.sidebar.multiselect("Filter by Follow up:", follow_up_options, placeholder="All")
+    selected_rep = st.sidebar.multiselect("Filter by Rep:", rep_options, placeholder="All") # Added Rep filter
+    selected_outcome = st.sidebar.multiselect("Filter by Event Outcome:", outcome_options, placeholder="All") # Added Outcome filter
 
     # Add text search for Company or Contact
     search_term = st.sidebar.text_input("Search by Company or Contact Name:")
 
     # --- Filter Dataframe based on selections ---
-    df_filtered = df.copy() # Start with a copy of the original data
-
-    # Apply multiselect filters
-    if selected_scoring:
-        df_filtered = df_filtered[df_filtered['Scoring'].isin(selected_scoring)]
-    if selected_vertikal:
-        df_filtered = df_filtered[df_filtered['Vertikal'].isin(selected_vertikal)]
-    if selected_follow_up:
-        df_filtered = df_filtered[df_filtered['Follow up'].isin(selected_follow_up)]
-    if selected_rep:
-        df_filtered = df_filtered[df_filtered['Rep'].isin(selected_rep)]
-    if selected_outcome:
-        df_filtered = df_filtered[df_filtered['Event Outcome'].isin(selected_outcome)]
+    # Build one combined boolean mask and index once, instead of chaining
+    # df_filtered = df_filtered[...] steps that each copy the whole frame.
+    mask = np.ones(len(df), dtype=bool)
+
+    # Apply multiselect filters. A selection that covers every option cannot
+    # narrow anything (multiselect values are unique members of the option
+    # list), so skip the scan in that case too.
+    if selected_scoring and len(selected_scoring) < len(scoring_options):
+        mask &= isin_mask(df['Scoring'], selected_scoring)
+    if selected_vertikal and len(selected_vertikal) < len(vertikal_options):
+        mask &= isin_mask(df['Vertikal'], selected_vertikal)
+    if selected_follow_up and len(selected_follow_up) < len(follow_up_options):
+        mask &= isin_mask(df['Follow up'], selected_follow_up)
+    if selected_rep and len(selected_rep) < len(rep_options):
+        mask &= isin_mask(df['Rep'], selected_rep)
+    if selected_outcome and len(selected_outcome) < len(outcome_options):
+        mask &= isin_mask(df['Event Outcome'], selected_outcome)
 
     # Apply text search filter (case-insensitive)
     if search_term:
-        # Ensure search works even if names/company are numbers or missing (NaN)
-        search_condition = (
-            df_filtered['Firma'].astype(str).str.contains(search_term, case=False, na=False) |
-            df_filtered['Vorname'].astype(str).str.contains(search_term, case=False, na=False) |
-            df_filtered['Nachname'].astype(str).str.contains(search_term, case=False, na=False)
-        )
-        df_filtered = df_filtered[search_condition]
+        # regex=False dispatches to a plain C substring search; missing values
+        # were already folded into the blob at load time
+        mask &= df['_search_blob'].str.contains(search_term.lower(), regex=False).to_numpy()
+
+    df_filtered = df.loc[mask]
+
+    # Hashable key describing the active filters, used to cache chart counts
+    filter_key = (
+        tuple(selected_scoring), tuple(selected_vertikal), tuple(selected_follow_up),
+        tuple(selected_rep), tuple(selected_outcome), search_term,
+    )
 
 else:
     # If data loading failed, create an empty dataframe to avoid errors later
@@ -93,11 +218,12 @@ if df_filtered is not None and not df_filtered.empty:
     # --- KPI Cards ---
     st.header("Key Metrics")
     total_leads = df_filtered.shape[0]
-    # Count leads by score (example assumes 'A', 'B', 'C' are main scores)
-    leads_a = df_filtered[df_filtered['Scoring'] == 'A'].shape[0] if 'A' in df_filtered['Scoring'].values else 0
-    leads_b = df_filtered[df_filtered['Scoring'] == 'B'].shape[0] if 'B' in df_filtered['Scoring'].values else 0
-    leads_c = df_filtered[df_filtered['Scoring'] == 'C'].shape[0] if 'C' in df_filtered['Scoring'].values else 0
-    leads_unscored = df_filtered[df_filtered['Scoring'] == 'Unscored'].shape[0] if 'Unscored' in df_filtered['Scoring'].values else 0
+    # Count leads by score in a single pass (example assumes 'A', 'B', 'C' are main scores)
+    scoring_kpi_counts = dict(zip(*category_counts(df_filtered['Scoring'])))
+    leads_a = scoring_kpi_counts.get('A', 0)
+    leads_b = scoring_kpi_counts.get('B', 0)
+    leads_c = scoring_kpi_counts.get('C', 0)
+    leads_unscored = scoring_kpi_counts.get('Unscored', 0)
 
 
     kpi_cols = st.columns(5) # Create columns for KPIs
@@ -111,52 +237,40 @@ if df_filtered is not None and not df_filtered.empty:
 
     # --- Charts ---
     st.header("Visualizations")
+    counts_by_col = chart_counts(df_filtered, filter_key)
     chart_cols = st.columns(2) # Create two columns for charts
 
     # Leads per Vertical (Bar Chart)
-    if 'Vertikal' in df_filtered.columns:
-        vertical_counts = df_filtered['Vertikal'].value_counts().reset_index()
-        vertical_counts.columns = ['Vertikal', 'Count']
-        fig_vertical = px.bar(vertical_counts, x='Vertikal', y='Count', title='Leads per Vertical',
-                              text_auto=True) # Show count on bars
-        fig_vertical.update_layout(xaxis_title=None) # Cleaner axis
+    if 'Vertikal' in counts_by_col:
+        vertical_counts = counts_by_col['Vertikal']
+        fig_vertical = make_bar_chart(vertical_counts, 'Leads per Vertical')
         chart_cols[0].plotly_chart(fig_vertical, use_container_width=True)
 
     # Leads per Rep (Pie Chart - use Bar if many Reps)
-    if 'Rep' in df_filtered.columns:
-        rep_counts = df_filtered['Rep'].value_counts().reset_index()
-        rep_counts.columns = ['Rep', 'Count']
+    if 'Rep' in counts_by_col:
+        rep_counts = counts_by_col['Rep']
         # Use Pie for few reps, Bar for many
         if len(rep_counts) < 8:
-             fig_rep = px.pie(rep_counts, names='Rep', values='Count', title='Leads per Rep', hole=0.3)
+             fig_rep = make_pie_chart(rep_counts, 'Leads per Rep')
         else:
-             fig_rep = px.bar(rep_counts.sort_values('Count', ascending=False),
-                              x='Rep', y='Count', title='Leads per Rep', text_auto=True)
-             fig_rep.update_layout(xaxis_title=None)
+             fig_rep = make_bar_chart(rep_counts.sort_values('Count', ascending=False),
+                                      'Leads per Rep')
         chart_cols[1].plotly_chart(fig_rep, use_container_width=True)
 
     chart_cols2 = st.columns(2) # Another row for charts
 
     # Event Outcome Distribution (Pie Chart)
-    if 'Event Outcome' in df_filtered.columns:
-        outcome_counts = df_filtered['Event Outcome'].value_counts().reset_index()
-        outcome_counts.columns = ['Event Outcome', 'Count']
-        fig_outcome = px.pie(outcome_counts, names='Event Outcome', values='Count',
-                             title='Event Outcome Distribution', hole=0.3)
+    if 'Event Outcome' in counts_by_col:
+        outcome_counts = counts_by_col['Event Outcome']
+        fig_outcome = make_pie_chart(outcome_counts, 'Event Outcome Distribution')
         chart_cols2[0].plotly_chart(fig_outcome, use_container_width=True)
 
     # Placed in column 2
-    if 'Scoring' in df_filtered.columns:
-        scoring_counts = df_filtered['Scoring'].value_counts().reset_index()
-        # Rename columns for clarity in Plotly
-        scoring_counts.columns = ['Scoring', 'Count']
-        fig_scoring = px.pie(scoring_counts,
-                             names='Scoring',        # Column with categories (A, B, C...)
-                             values='Count',         # Column with counts
-                             title='Lead Quality Distribution (Scoring)',
-                             hole=0.3)              # Make it a donut chart
-        # Optional: Improve label display
-        fig_scoring.update_traces(textposition='inside', textinfo='percent+label')
+    if 'Scoring' in counts_by_col:
+        scoring_counts = counts_by_col['Scoring']
+        fig_scoring = make_pie_chart(scoring_counts,
+                                     'Lead Quality Distribution (Scoring)',
+                                     textinfo='percent+label')
         # Display the chart in the 3rd column of the second row
         chart_cols2[1].plotly_chart(fig_scoring, use_container_width=True)
 
@@ -167,18 +281,13 @@ if df_filtered is not None and not df_filtered.empty:
     st.header("Lead Details")
     st.markdown("Scroll within the table to see all columns and rows.")
 
-    # Select columns to display in the table (adjust as needed)
-    display_columns = [
-        'Rep', 'Scoring', 'Vertikal', 'Firma', 'Vorname', 'Nachname',
-        'E-Mail', 'Phone', 'LinkedIn', # Add contact details if they exist
-        'Event Outcome', 'Follow up', 'Upsell Potential',
-        'Notizen', 'Extra Notizen' # Place notes at the end for readability
-    ]
     # Filter out columns that might not exist in the loaded data
-    display_columns = [col for col in display_columns if col in df_filtered.columns]
+    display_columns = [col for col in DISPLAY_COLUMNS if col in df_filtered.columns]
 
-    # Use st.dataframe for a standard interactive table
-    st.dataframe(df_filtered[display_columns], use_container_width=True, height=500)
+    # Use st.dataframe for a standard interactive table; column_order selects
+    # and orders the shown columns without materializing a column-subset copy
+    st.dataframe(df_filtered, column_order=display_columns,
+                 use_container_width=True, height=500)
     # Note: Showing full notes on hover requires more complex components.
     # st.dataframe usually allows scrolling within cells if text is long.
 